@@ -1,42 +1,59 @@
 #!/usr/bin/env python3
 
 import os
-import sys
 import signal
+import time
+import select
 import logging
 import threading
-from configparser import ConfigParser
 import functools
+import contextlib
 import inspect
-import traceback
+import ctypes
 import typing as t
 import dbus
 import dbus.service
 import dbus.mainloop.glib
 import dbus.exceptions
 from xdg.BaseDirectory import save_config_path
-from psutil import Process
 from gi.repository import GLib
 
 
 TUNEDMODE_BUS_NAME = 'com.feralinteractive.GameMode'
 TUNEDMODE_BUS_PATH = '/com/feralinteractive/GameMode'
 
+SYS_pidfd_open = 434
+
+TUNED_ACTIVE_PROFILE_PATH = '/etc/tuned/active_profile'
+
+# Interval in seconds at which exited games are polled for without pidfds
+PROCESS_POLL_INTERVAL = 0.5
+
 CONFIG_DEFAULTS = {
     'tuned': {
-        'gaming-profile': 'latency-performance'
+        'gaming-profile': 'latency-performance',
+        # Delay in ms before a profile switch is applied, so that bursts of
+        # register/unregister requests result in a single switch
+        'switch-delay': '250',
     }
 }
 
+# Written out on first run, keep in sync with CONFIG_DEFAULTS
+DEFAULT_CONFIG = '''\
+[tuned]
+gaming-profile = latency-performance
+switch-delay = 250
+'''
+
+# Debug output (e.g. tracebacks) is only printed with TUNEDMODE_DEBUG set
+DEBUG = bool(os.environ.get('TUNEDMODE_DEBUG'))
+
 RES_SUCCESS = 0
 RES_ERROR = -1
 RES_REJECTED = -2
 
 
-def log(message, level=logging.INFO):
-    """Log provided message somewhere."""
-    # TODO make logging to stderr OR to syslog
-    print(message, file=sys.stderr)
+logger = logging.getLogger('tunedmode')
 
 
 def dbus_handle_exceptions(func):
@@ -48,8 +65,8 @@ def dbus_handle_exceptions(func):
             # only log DBusExceptions once
             raise ex
         except Exception as ex:
-            log(f"Exception {ex} occured in {func}", logging.ERROR)
-            log(traceback.format_exc(), logging.DEBUG)
+            logger.error("Exception %s occured in %s", ex, func,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
             raise ex
     # HACK: functools.wraps() does not copy the function signature and
     # dbus-python doesn't support varargs. As such we need to copy the
@@ -65,35 +82,160 @@ def dbus_handle_exceptions(func):
     return _impl
 
 
+def get_process_name(pid: int) -> str:
+    """Return the short process name of pid, or an empty string."""
+    try:
+        with open(f'/proc/{pid}/comm', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+class ProcessName:
+    """Name of process pid, looked up only when formatted into a message."""
+
+    __slots__ = ('pid',)
+
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def __str__(self):
+        return get_process_name(self.pid)
+
+
+@functools.lru_cache(maxsize=1)
+def get_config_dir() -> str:
+    """Return tunedmode's XDG config directory, creating it if needed."""
+    return save_config_path('tunedmode')
+
+
+def parse_config(lines: t.Iterable[str]) -> t.Dict[str, t.Dict[str, str]]:
+    """Parse INI-style config lines on top of CONFIG_DEFAULTS."""
+    config = {section: dict(options) for section, options in CONFIG_DEFAULTS.items()}
+    options = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line[0] == '[' and line[-1] == ']':
+            options = config.setdefault(line[1:-1].strip(), {})
+            continue
+        key, sep, value = line.partition('=')
+        if options is None or not sep:
+            raise ValueError(f'Malformed config line: {line}')
+        options[key.strip().lower()] = value.strip()
+    return config
+
+
+# (path, mtime, parsed config) of the config file read last
+_config_cache: t.Optional[t.Tuple[str, int, t.Dict[str, t.Dict[str, str]]]] = None
+
+
+def read_config(config_path: str) -> t.Dict[str, t.Dict[str, str]]:
+    """Read config file, creating it with the defaults if it doesn't exist.
+
+    The parsed config is reused for as long as the file's mtime is unchanged.
+    """
+    global _config_cache
+    try:
+        # Exclusive create, so that instances starting at the same time don't
+        # clobber each other's (or the user's) file
+        with open(config_path, 'x') as config_file:
+            config_file.write(DEFAULT_CONFIG)
+        return parse_config(())
+    except FileExistsError:
+        pass
+    mtime = os.stat(config_path).st_mtime_ns
+    if _config_cache is not None and _config_cache[:2] == (config_path, mtime):
+        return _config_cache[2]
+    with open(config_path, 'r') as config_file:
+        config = parse_config(config_file)
+    _config_cache = (config_path, mtime, config)
+    return config
+
+
+def get_process_start_time(pid: int) -> int:
+    """Return start time of process pid in clock ticks since boot.
+
+    Together with the PID this identifies a process, even after the PID has
+    been reused.
+    """
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except FileNotFoundError:
+        raise ProcessLookupError(f'No process with PID {pid}') from None
+    # comm may contain spaces and parentheses, so fields are counted from the
+    # last ')'; starttime is field 22, the state (field 3) follows comm
+    return int(stat[stat.rindex(b')') + 2:].split()[19])
+
+
+def pidfd_open(pid: int) -> int:
+    """Return a pidfd for pid, like os.pidfd_open() on Python < 3.9 too."""
+    if hasattr(os, 'pidfd_open'):
+        return os.pidfd_open(pid)
+    libc = ctypes.CDLL(None, use_errno=True)
+    pid_fd = libc.syscall(SYS_pidfd_open, pid, 0)
+    if pid_fd < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return pid_fd
+
+
 def pidfd_to_pid(pid_fd: int) -> int:
-    with open(f'/proc/self/fdinfo/{pid_fd}', 'r') as f:
-        fdinfo_text = f.read()
-    for line in fdinfo_text.splitlines():
-        field, value = line.split(maxsplit=1)
-        if field == 'Pid:':
-            return int(value)
-    raise ValueError(fdinfo_text)
+    fdinfo_fd = os.open(f'/proc/self/fdinfo/{pid_fd}', os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        # Pid: comes after the pos, flags, mnt_id and ino fields, well within
+        # the first couple hundred bytes
+        fdinfo = os.read(fdinfo_fd, 256)
+    finally:
+        os.close(fdinfo_fd)
+    start = fdinfo.find(b'\nPid:\t')
+    if start < 0:
+        raise ValueError(fdinfo)
+    start += len(b'\nPid:\t')
+    return int(fdinfo[start:fdinfo.index(b'\n', start)])
 
 
 class TunedMode(dbus.service.Object):
     """DBus daemon implementing GameMode-compatible interface."""
 
-    def __init__(self, dbus_name, dbus_path):
+    def __init__(self, dbus_name, dbus_path, system_bus):
         """Gather initial settings and config options."""
         super().__init__(bus_name=dbus_name, object_path=dbus_path)
-        self.system_bus = dbus.SystemBus()
-        self.tuned_obj = self.system_bus.get_object('com.redhat.tuned', '/Tuned')
+        self.system_bus = system_bus
+        # The interface is known up front, no need for an Introspect() call
+        self.tuned_obj = self.system_bus.get_object('com.redhat.tuned', '/Tuned',
+                                                    introspect=False)
         self.tuned = dbus.Interface(self.tuned_obj, 'com.redhat.tuned.control')
-        self.registred_games: t.Set[Process] = set()
-        self.process = Process()
-        self.initial_profile = self.tuned.active_profile()
-        self.config = ConfigParser()
+        # PID -> start time of the registered process, which tells a
+        # registered game apart from a later process reusing its PID
+        self.registred_games: t.Dict[int, int] = {}
+        self.initial_profile = self._read_active_profile()
+        self._active_profile = self.initial_profile
+        # Keep _active_profile right when someone else switches profiles too.
+        # TuneD signals a switch only once it is applied, well after our
+        # switch_profile call returned; count the signals still owed for our
+        # own switches so that late ones don't overwrite newer state.
+        self._own_switches_pending = 0
+        self.tuned.connect_to_signal('profile_changed', self._on_profile_changed)
+        self._pending_profile: t.Optional[str] = None
+        self._debounce_source: t.Optional[int] = None
+        # pidfds of all watched games share one epoll set, so the main loop
+        # has a single source to watch no matter how many games are running
+        self._pidfds: t.Dict[int, t.Tuple[int, int]] = {}
+        # PID -> its pidfd, at most one per watched game
+        self._game_pidfds: t.Dict[int, int] = {}
+        self._batched_properties: t.Optional[t.Dict[str, t.Any]] = None
+        self._epoll = select.epoll()
+        self._epoll_source = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, self._epoll.fileno(), GLib.IOCondition.IN,
+            self._on_processes_exit)
         self._read_config()
         self.gaming_profile = self.config['tuned']['gaming-profile']
-        if self.gaming_profile not in self.tuned.profiles():
-            raise ValueError(f'Gaming profile "{self.gaming_profile}" doesn\'t exist')
-        log(f'Initial profile is "{self.initial_profile}", '
-            f'gaming profile is "{self.gaming_profile}"')
+        self.switch_delay = int(self.config['tuned']['switch-delay'])
+        logger.info('Initial profile is "%s", gaming profile is "%s"',
+                    self.initial_profile, self.gaming_profile)
 
     def __enter__(self):
         """Set thing up."""
@@ -101,181 +243,366 @@ class TunedMode(dbus.service.Object):
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Make sure TuneD profile it set back to initial value."""
-        log("Stopping tunedmode...")
+        logger.info("Stopping tunedmode...")
+        if self._debounce_source is not None:
+            GLib.source_remove(self._debounce_source)
+            self._debounce_source = None
+        GLib.source_remove(self._epoll_source)
+        for pidfd in self._pidfds:
+            os.close(pidfd)
+        self._epoll.close()
         self._switch_profile(self.initial_profile)
-        self.system_bus.close()
         if exc_value:
             raise
 
+    def _read_active_profile(self) -> str:
+        # TuneD records the active profile on disk whenever it changes, which
+        # is cheaper to read than asking it over D-Bus.
+        try:
+            with open(TUNED_ACTIVE_PROFILE_PATH, 'r') as f:
+                profile = f.read().strip()
+        except OSError:
+            profile = ''
+        return profile or self.tuned.active_profile()
+
     def _read_config(self):
-        config_path = os.path.join(save_config_path('tunedmode'), 'tunedmode.ini')
-        self.config.read_dict(CONFIG_DEFAULTS)
-        self.config.read(config_path)
-        if not os.path.isfile(config_path):
-            with open(config_path, 'w') as config_file:
-                self.config.write(config_file)
-
-    def __watch_process_worker(self, proc: Process):
-        if proc.is_running():
-            proc.wait()
-            log(f"Process: {proc.pid} exited")
-        else:
-            log(f"Process: {proc.pid} does not exist (already exited?)")
-        if proc in self.registred_games:
-            self._unregister_game(self.process, proc)
+        self.config = read_config(os.path.join(get_config_dir(), 'tunedmode.ini'))
 
-    def _watch_process(self, proc: Process):
-        watcher_thread = threading.Thread(target=self.__watch_process_worker, args=(proc,))
-        watcher_thread.daemon = True
-        watcher_thread.start()
-        return watcher_thread
+    def __watch_process_worker(self, pid: int, start_time: int):
+        # Without a pidfd there is nothing to wait on, so poll. Comparing start
+        # times each round also catches the PID being reused in between.
+        running = False
+        try:
+            while get_process_start_time(pid) == start_time:
+                running = True
+                time.sleep(PROCESS_POLL_INTERVAL)
+        except ProcessLookupError:
+            pass
+        if running:
+            logger.info("Process: %d exited", pid)
+        else:
+            logger.info("Process: %d does not exist (already exited?)", pid)
+        # Hand the bookkeeping over to the main loop, so that registred_games
+        # is only ever touched from one thread.
+        GLib.idle_add(self._deferred_unregister, pid, start_time)
+
+    def _deferred_unregister(self, pid: int, start_time: int):
+        if self.registred_games.get(pid) == start_time:
+            self._remove_game(pid)
+        return GLib.SOURCE_REMOVE
+
+    def _on_processes_exit(self, epoll_fd: int, condition: GLib.IOCondition):
+        for pidfd, _ in self._epoll.poll(0):
+            pid, start_time = self._pidfds[pidfd]
+            self._unwatch_process(pid)
+            logger.info("Process: %d exited", pid)
+            self._deferred_unregister(pid, start_time)
+        return GLib.SOURCE_CONTINUE
+
+    def _watch_process(self, pid: int, start_time: int):
+        # A pidfd becomes readable when the process exits, so the main loop
+        # gets woken exactly once per game without a thread polling /proc.
+        # Fall back to a watcher thread where pidfds aren't available.
+        pidfd = self._game_pidfds.get(pid)
+        if pidfd is not None:
+            if self._pidfds[pidfd][1] == start_time:
+                return
+            # Left over from an earlier process with the same PID
+            self._unwatch_process(pid)
+        try:
+            pidfd = pidfd_open(pid)
+        except ProcessLookupError:
+            pidfd = None
+        except OSError:
+            watcher_thread = threading.Thread(target=self.__watch_process_worker,
+                                              args=(pid, start_time))
+            watcher_thread.daemon = True
+            watcher_thread.start()
+            return
+        # The PID may have been reused since start_time was read
+        if pidfd is not None and self._is_registred(pid):
+            self._pidfds[pidfd] = (pid, start_time)
+            self._game_pidfds[pid] = pidfd
+            self._epoll.register(pidfd, select.EPOLLIN)
+            return
+        if pidfd is not None:
+            os.close(pidfd)
+        logger.info("Process: %d does not exist (already exited?)", pid)
+        GLib.idle_add(self._deferred_unregister, pid, start_time)
+
+    def _unwatch_process(self, pid: int):
+        pidfd = self._game_pidfds.pop(pid, None)
+        if pidfd is not None:
+            del self._pidfds[pidfd]
+            self._epoll.unregister(pidfd)
+            os.close(pidfd)
 
     def _switch_profile(self, profile: str):
-        if profile == self.tuned.active_profile():
+        # Trust our own record of the active profile instead of asking TuneD
+        # over D-Bus every time; only an actual switch needs a round-trip.
+        if profile == self._active_profile:
             return (True, "Requested profile is already active")
-        log(f'Switching to profile "{profile}"')
+        logger.info('Switching to profile "%s"', profile)
         success, msg = self.tuned.switch_profile(profile)
-        if not success:
-            log(f'Switching to "{profile}" failed: {msg}')
+        if success:
+            self._active_profile = profile
+            self._own_switches_pending += 1
+        else:
+            logger.error('Switching to "%s" failed: %s', profile, msg)
         return (success, msg)
 
-    def _register_allowed(self, caller: Process, game: Process) -> bool:
+    @functools.cached_property
+    def _profiles(self) -> t.FrozenSet[str]:
+        # Fetched on the first registration rather than at startup
+        return frozenset(self.tuned.profiles())
+
+    def _on_profile_changed(self, profile: str, success: bool, msg: str):
+        if self._own_switches_pending:
+            self._own_switches_pending -= 1
+            return
+        if success:
+            self._active_profile = str(profile)
+
+    def _schedule_profile(self, profile: str):
+        """Switch to profile after switch_delay ms.
+
+        Requests made before the switch happens replace the pending profile.
+        """
+        if self._debounce_source is None and profile == self._active_profile:
+            return
+        self._pending_profile = profile
+        if self._debounce_source is None:
+            self._debounce_source = GLib.timeout_add(self.switch_delay, self._flush_profile)
+
+    def _flush_profile(self):
+        self._debounce_source = None
+        # Runs from a timeout rather than a D-Bus method, so there is no
+        # caller left to hand TuneD's errors back to
+        try:
+            self._switch_profile(self._pending_profile)
+        except dbus.exceptions.DBusException as ex:
+            logger.error('Switching to "%s" failed: %s', self._pending_profile, ex)
+        finally:
+            self._pending_profile = None
+        return GLib.SOURCE_REMOVE
+
+    def _get_properties(self) -> t.Dict[str, t.Any]:
+        return {'ClientCount': dbus.Int32(len(self.registred_games))}
+
+    @contextlib.contextmanager
+    def _dbus_batch(self):
+        """Announce all property changes made in the block with one signal."""
+        if self._batched_properties is not None:
+            yield
+            return
+        self._batched_properties = self._get_properties()
+        try:
+            yield
+        finally:
+            old_properties, self._batched_properties = self._batched_properties, None
+            changed = {name: value for name, value in self._get_properties().items()
+                       if old_properties[name] != value}
+            if changed:
+                self.PropertiesChanged(TUNEDMODE_BUS_NAME, changed, [])
+
+    def _is_registred(self, pid: int) -> bool:
+        start_time = self.registred_games.get(pid)
+        if start_time is None:
+            return False
+        try:
+            return get_process_start_time(pid) == start_time
+        except ProcessLookupError:
+            return False
+
+    def _remove_game(self, pid: int):
+        games = self.registred_games
+        self._unwatch_process(pid)
+        with self._dbus_batch():
+            last_game = len(games) == 1
+            del games[pid]
+            if last_game:
+                logger.info("No more registred PIDs left")
+                self._schedule_profile(self.initial_profile)
+
+    def _register_allowed(self, caller_pid: int, game_pid: int) -> bool:
         #TODO: Actually do some check if caller is permitted to register game
         return True
 
-    def _unregister_allowed(self, caller: Process, game: Process) -> bool:
+    def _unregister_allowed(self, caller_pid: int, game_pid: int) -> bool:
         #TODO: Actually do some check if caller is permitted to unregister game
         return True
 
-    def _query_allowed(self, caller: Process, game: Process) -> bool:
+    def _query_allowed(self, caller_pid: int, game_pid: int) -> bool:
         #TODO: Actually do some check if caller is permitted to query status of game
         return True
 
-    def _register_game(self, caller: Process, game: Process) -> int:
-        log(f'Request: register {game.pid} ({game.exe()}) by {caller.pid} ({caller.exe()})')
-        if not self._register_allowed(caller, game):
+    def _register_game(self, caller_pid: int, game_pid: int) -> int:
+        logger.info('Request: register %d (%s) by %d (%s)',
+                    game_pid, ProcessName(game_pid), caller_pid, ProcessName(caller_pid))
+        if not self._register_allowed(caller_pid, game_pid):
             return RES_REJECTED
-        if game in self.registred_games:
-            log(f'Process: {game} is already registred', logging.ERROR)
+        games = self.registred_games
+        start_time = get_process_start_time(game_pid)
+        if games.get(game_pid) == start_time:
+            logger.error('Process: %d is already registred', game_pid)
             return RES_ERROR
-        success, _ = self._switch_profile(self.gaming_profile)
-        if success:
-            self.registred_games.add(game)
-            self._watch_process(game)
-            return RES_SUCCESS
-        return RES_ERROR
-
-    def _unregister_game(self, caller: Process, game: Process) -> int:
-        log(f'Request: unregister {game.pid} ({game.exe()}) by {caller.pid} ({caller.exe()})')
-        if not self._unregister_allowed(caller, game):
+        # The switch itself happens after we have replied, so a missing
+        # gaming profile has to be caught here to reach the caller at all
+        if self.gaming_profile not in self._profiles:
+            logger.error('Gaming profile "%s" doesn\'t exist, check the config',
+                         self.gaming_profile)
+            return RES_ERROR
+        with self._dbus_batch():
+            self._schedule_profile(self.gaming_profile)
+            games[game_pid] = start_time
+            self._watch_process(game_pid, start_time)
+        return RES_SUCCESS
+
+    def _unregister_game(self, caller_pid: int, game_pid: int) -> int:
+        logger.info('Request: unregister %d (%s) by %d (%s)',
+                    game_pid, ProcessName(game_pid), caller_pid, ProcessName(caller_pid))
+        if not self._unregister_allowed(caller_pid, game_pid):
             return RES_REJECTED
-        if game not in self.registred_games:
-            log(f'Process: {game.pid} is not registred', logging.ERROR)
+        if not self._is_registred(game_pid):
+            logger.error('Process: %d is not registred', game_pid)
             return RES_ERROR
-        self.registred_games.remove(game)
-        if not self.registred_games:
-            log("No more registred PIDs left")
-            success, _ = self._switch_profile(self.initial_profile)
-            if not success:
-                return RES_ERROR
+        self._remove_game(game_pid)
         return RES_SUCCESS
 
-    def _query_status(self, caller: Process, game: Process) -> int:
-        log(f'Request: status {game.pid} ({game.exe()}) by {caller.pid} ({caller.exe()})')
-        if not self._query_allowed(caller, game):
+    def _query_status(self, caller_pid: int, game_pid: int) -> int:
+        logger.info('Request: status %d (%s) by %d (%s)',
+                    game_pid, ProcessName(game_pid), caller_pid, ProcessName(caller_pid))
+        if not self._query_allowed(caller_pid, game_pid):
             return RES_REJECTED
         ret = 0
         if self.registred_games:
             ret += 1
-            if game in self.registred_games:
+            if self._is_registred(game_pid):
                 ret += 1
         return ret
 
     @staticmethod
-    def _get_processes(caller_pid: int, game_pid: int) -> t.Tuple[Process, Process]:
-        if caller_pid == game_pid:
-            caller = game = Process(game_pid)
-        else:
-            caller, game = Process(caller_pid), Process(game_pid)
-        return caller, game
+    def _pidfds_to_pids(caller_pidfd: dbus.types.UnixFd,
+                        game_pidfd: dbus.types.UnixFd) -> t.Tuple[int, int]:
+        pids = []
+        for unix_fd in (caller_pidfd, game_pidfd):
+            # take() transfers ownership of the descriptor, we have to close it
+            pid_fd = unix_fd.take()
+            try:
+                pids.append(pidfd_to_pid(pid_fd))
+            finally:
+                os.close(pid_fd)
+        caller_pid, game_pid = pids
+        return caller_pid, game_pid
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='i', out_signature='i')
     @dbus_handle_exceptions
     def RegisterGame(self, i: dbus.types.Int32) -> int: #pylint: disable=invalid-name
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._register_game(*self._get_processes(i, i))
+        return self._register_game(i, i)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='ii', out_signature='i')
     @dbus_handle_exceptions
     def RegisterGameByPID(self, caller_pid: dbus.types.Int32, #pylint: disable=invalid-name
                                 game_pid: dbus.types.Int32) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._register_game(*self._get_processes(caller_pid, game_pid))
+        return self._register_game(caller_pid, game_pid)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='hh', out_signature='i')
     @dbus_handle_exceptions
     def RegisterGameByPIDFd(self, caller_pidfd: dbus.types.UnixFd, #pylint: disable=invalid-name
                                   game_pidfd: dbus.types.UnixFd) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        caller_pid = pidfd_to_pid(caller_pidfd.take())
-        game_pid = pidfd_to_pid(game_pidfd.take())
-        return self._register_game(*self._get_processes(caller_pid, game_pid))
+        caller_pid, game_pid = self._pidfds_to_pids(caller_pidfd, game_pidfd)
+        return self._register_game(caller_pid, game_pid)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='i', out_signature='i')
     @dbus_handle_exceptions
     def UnregisterGame(self, i: dbus.types.Int32) -> int: #pylint: disable=invalid-name
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._unregister_game(*self._get_processes(i, i))
+        return self._unregister_game(i, i)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='ii', out_signature='i')
     @dbus_handle_exceptions
     def UnregisterGameByPID(self, caller_pid: dbus.types.Int32, #pylint: disable=invalid-name
                                   game_pid: dbus.types.Int32) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._unregister_game(*self._get_processes(caller_pid, game_pid))
+        return self._unregister_game(caller_pid, game_pid)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='hh', out_signature='i')
     @dbus_handle_exceptions
     def UnregisterGameByPIDFd(self, caller_pidfd: dbus.types.UnixFd, #pylint: disable=invalid-name
                                     game_pidfd: dbus.types.UnixFd) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        caller_pid = pidfd_to_pid(caller_pidfd.take())
-        game_pid = pidfd_to_pid(game_pidfd.take())
-        return self._unregister_game(*self._get_processes(caller_pid, game_pid))
+        caller_pid, game_pid = self._pidfds_to_pids(caller_pidfd, game_pidfd)
+        return self._unregister_game(caller_pid, game_pid)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='i', out_signature='i')
     @dbus_handle_exceptions
     def QueryStatus(self, i: dbus.types.Int32) -> int: #pylint: disable=invalid-name
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._query_status(*self._get_processes(i, i))
+        return self._query_status(i, i)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='ii', out_signature='i')
     @dbus_handle_exceptions
     def QueryStatusByPID(self, caller_pid: dbus.types.Int32, #pylint: disable=invalid-name
                                game_pid: dbus.types.Int32) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        return self._query_status(*self._get_processes(caller_pid, game_pid))
+        return self._query_status(caller_pid, game_pid)
 
     @dbus.service.method(TUNEDMODE_BUS_NAME, in_signature='hh', out_signature='i')
     @dbus_handle_exceptions
     def QueryStatusByPIDFd(self, caller_pidfd: dbus.types.UnixFd, #pylint: disable=invalid-name
                                  game_pidfd: dbus.types.UnixFd) -> int:
         """D-Bus method implementing corresponding gamemoded method."""
-        caller_pid = pidfd_to_pid(caller_pidfd.take())
-        game_pid = pidfd_to_pid(game_pidfd.take())
-        return self._query_status(*self._get_processes(caller_pid, game_pid))
+        caller_pid, game_pid = self._pidfds_to_pids(caller_pidfd, game_pidfd)
+        return self._query_status(caller_pid, game_pid)
+
+    @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature='ss', out_signature='v')
+    def Get(self, interface_name: str, property_name: str): #pylint: disable=invalid-name
+        """D-Bus method implementing org.freedesktop.DBus.Properties.Get."""
+        properties = self.GetAll(interface_name)
+        if property_name not in properties:
+            raise dbus.exceptions.DBusException(
+                f'No such property {property_name}',
+                name='org.freedesktop.DBus.Error.UnknownProperty')
+        return properties[property_name]
+
+    @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature='s', out_signature='a{sv}')
+    def GetAll(self, interface_name: str): #pylint: disable=invalid-name
+        """D-Bus method implementing org.freedesktop.DBus.Properties.GetAll."""
+        if interface_name != TUNEDMODE_BUS_NAME:
+            raise dbus.exceptions.DBusException(
+                f'No such interface {interface_name}',
+                name='org.freedesktop.DBus.Error.UnknownInterface')
+        return self._get_properties()
+
+    @dbus.service.signal(dbus.PROPERTIES_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface_name, changed_properties, #pylint: disable=invalid-name
+                          invalidated_properties):
+        """D-Bus signal emitted when properties change."""
 
 
 def run_tunedmode():
     """Run the daemon with provided config."""
+    # TODO make logging to stderr OR to syslog
+    logging.basicConfig(format='%(message)s',
+                        level=logging.DEBUG if DEBUG else logging.INFO)
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
     session_bus = dbus.SessionBus()
+    # Opened once and shared by everything talking to system services. It is
+    # private so that it carries only our own traffic, and so that it may be
+    # closed on exit.
+    system_bus = dbus.SystemBus(private=True)
     bus_name = dbus.service.BusName(TUNEDMODE_BUS_NAME, bus=session_bus)
-    with TunedMode(bus_name, TUNEDMODE_BUS_PATH):
-        loop = GLib.MainLoop()
-        signal.signal(signal.SIGTERM, lambda n, f: loop.quit())
-        signal.signal(signal.SIGINT, lambda n, f: loop.quit())
-        loop.run()
+    try:
+        with TunedMode(bus_name, TUNEDMODE_BUS_PATH, system_bus):
+            loop = GLib.MainLoop()
+            signal.signal(signal.SIGTERM, lambda n, f: loop.quit())
+            signal.signal(signal.SIGINT, lambda n, f: loop.quit())
+            loop.run()
+    finally:
+        system_bus.close()
 
 
 def main():